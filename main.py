@@ -1,8 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routes import auth, portfolio
-from database import engine
+from database import engine, SessionLocal
 from models.portfolio import Portfolio
+from models.refresh_token import RefreshToken
+from models.revoked_token import RevokedToken
+from utils.token_revocation import load_revoked_tokens
 import os
 
 app = FastAPI()
@@ -21,6 +24,15 @@ app.add_middleware(
 # Crear las tablas
 Portfolio.metadata.create_all(bind=engine)
 
+# Cargar en memoria los tokens revocados
+@app.on_event("startup")
+def load_token_revocations():
+    db = SessionLocal()
+    try:
+        load_revoked_tokens(db)
+    finally:
+        db.close()
+
 # Incluir rutas
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(portfolio.router, prefix="/portfolio", tags=["portfolio"])
@@ -0,0 +1,13 @@
+# models/refresh_token.py
+from sqlalchemy import Column, Integer, String, DateTime
+from database import Base
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    jti = Column(String(64), primary_key=True)  # Identificador único del refresh token (claim 'jti')
+    user_id = Column(Integer, index=True)  # Usuario dueño de la sesión
+    expires_at = Column(DateTime, index=True)  # Expiración real del refresh token
+
+    def __repr__(self):
+        return f"<RefreshToken(jti={self.jti}, user_id={self.user_id}, expires_at={self.expires_at})>"
@@ -0,0 +1,12 @@
+# models/revoked_token.py
+from sqlalchemy import Column, String, DateTime
+from database import Base
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(64), primary_key=True)  # Identificador único del token (claim 'jti')
+    expires_at = Column(DateTime, index=True)  # Expiración del token, a partir de ella se puede borrar
+
+    def __repr__(self):
+        return f"<RevokedToken(jti={self.jti}, expires_at={self.expires_at})>"
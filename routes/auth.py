@@ -4,20 +4,19 @@ from sqlalchemy.orm import Session
 from database import get_db
 from models.user import User
 from models.portfolio import Portfolio
-from schemas.auth import LoginRequest
+from models.refresh_token import RefreshToken
+from schemas.auth import LoginRequest, RefreshRequest, RevokeRequest
 from schemas.user import UserCreate, LoginRequest
 from passlib.context import CryptContext
-from jose import jwt
-from datetime import datetime, timedelta
+from jose import jwt, JWTError
+from datetime import datetime
 from fastapi.security import OAuth2PasswordBearer
+from utils.auth_handler import create_access_token, create_refresh_token, decode_token, get_current_user
+from utils.token_revocation import revoke_token
 
 router = APIRouter()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-SECRET_KEY = "@Chuchoman23"
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60
-
 # Crear la dependencia oauth2_scheme para obtener el token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
@@ -29,12 +28,20 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-# Función para generar token
-def create_access_token(data: dict, expires_delta: timedelta = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)):
-    to_encode = data.copy()
-    expire = datetime.utcnow() + expires_delta
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+# Función para generar el par access/refresh token y registrar la sesión
+def issue_tokens(db: Session, user: User):
+    refresh_token, refresh_jti, refresh_expire = create_refresh_token(user.email)
+    # 'rid' enlaza el access token con su refresh token para poder cerrar solo esta sesión
+    access_token = create_access_token({"email": user.email, "rid": refresh_jti})
+
+    # Una fila por sesión activa: varios dispositivos pueden refrescar a la vez
+    db.query(RefreshToken).filter(
+        RefreshToken.user_id == user.id, RefreshToken.expires_at <= datetime.utcnow()
+    ).delete()
+    db.add(RefreshToken(jti=refresh_jti, user_id=user.id, expires_at=refresh_expire))
+    db.commit()
+
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 # REGISTRO
 @router.post("/register")
@@ -66,9 +73,70 @@ def login(user_data: LoginRequest, db: Session = Depends(get_db)):
     if not user or not verify_password(user_data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Credenciales inválidas")
 
-    # Generar el token de acceso
-    token = create_access_token({"sub": user.email})
-    return {"access_token": token, "token_type": "bearer"}
+    # Generar los tokens de acceso y de refresco
+    return issue_tokens(db, user)
+
+# REFRESH
+@router.post("/refresh")
+def refresh(request: RefreshRequest, db: Session = Depends(get_db)):
+    payload = decode_token(request.refresh_token, token_type="refresh")
+
+    # Reclamar la sesión de forma atómica: de dos peticiones con el mismo token solo una borra la fila
+    claimed = db.query(RefreshToken).filter(RefreshToken.jti == payload["jti"]).delete()
+    db.commit()
+    if claimed != 1:
+        raise HTTPException(status_code=401, detail="Refresh token inválido")
+
+    user = db.query(User).filter(User.email == payload["sub"]).first()
+    if not user:
+        raise HTTPException(status_code=401, detail="Refresh token inválido")
+
+    # Rotación: el refresh token usado deja de ser válido
+    revoke_token(db, payload["jti"], datetime.utcfromtimestamp(payload["exp"]))
+    return issue_tokens(db, user)
+
+# LOGOUT
+@router.post("/logout")
+def logout(
+    token: str = Depends(oauth2_scheme),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    payload = decode_token(token)
+    revoke_token(db, payload["jti"], datetime.utcfromtimestamp(payload["exp"]))
+
+    # Revocar también el refresh token de esta sesión (las de otros dispositivos siguen activas)
+    refresh_session = db.get(RefreshToken, payload["rid"]) if payload.get("rid") else None
+    if refresh_session and refresh_session.user_id == current_user.id:
+        refresh_jti, refresh_expire = refresh_session.jti, refresh_session.expires_at
+        db.delete(refresh_session)
+        revoke_token(db, refresh_jti, refresh_expire)
+
+    return {"message": "Sesión cerrada correctamente"}
+
+# REVOCAR UN TOKEN (access o refresh)
+@router.post("/revoke")
+def revoke(
+    request: RevokeRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    try:
+        token_type = jwt.get_unverified_claims(request.token).get("type")
+    except JWTError:
+        raise HTTPException(status_code=400, detail="Token inválido")
+    if token_type not in ("access", "refresh"):
+        raise HTTPException(status_code=400, detail="Token inválido")
+
+    payload = decode_token(request.token, token_type=token_type)
+    if payload["sub"] != current_user.email:
+        raise HTTPException(status_code=403, detail="No tienes permiso para revocar este token")
+
+    if token_type == "refresh":
+        db.query(RefreshToken).filter(RefreshToken.jti == payload["jti"]).delete()
+    revoke_token(db, payload["jti"], datetime.utcfromtimestamp(payload["exp"]))
+
+    return {"message": "Token revocado correctamente"}
 
 # GET USER BY ID (INCLUYENDO EL PORTAFOLIO)
 @router.get("/user/{user_id}")
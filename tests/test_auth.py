@@ -0,0 +1,231 @@
+import heapq
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Base, get_db
+from models.refresh_token import RefreshToken
+from models.revoked_token import RevokedToken
+from models.user import User
+from routes import auth
+from utils import token_revocation
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine, tables=[User.__table__, RefreshToken.__table__, RevokedToken.__table__])
+    token_revocation._revoked.clear()
+    token_revocation._expiry_heap.clear()
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    token_revocation._revoked.clear()
+    token_revocation._expiry_heap.clear()
+    engine.dispose()
+
+
+@pytest.fixture
+def client(session_factory):
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/auth")
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+
+def register_and_login(client, email):
+    client.post("/auth/register", json={"full_name": "Test", "email": email, "password": "secret"})
+    response = client.post("/auth/login", json={"email": email, "password": "secret"})
+    assert response.status_code == 200
+    return response.json()
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_login_returns_access_and_refresh_tokens(client):
+    tokens = register_and_login(client, "ana@example.com")
+    assert tokens["access_token"]
+    assert tokens["refresh_token"]
+    assert tokens["token_type"] == "bearer"
+
+
+def test_refresh_rotation_rejects_old_refresh_token(client):
+    tokens = register_and_login(client, "ana@example.com")
+
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    new_tokens = response.json()
+    assert new_tokens["refresh_token"] != tokens["refresh_token"]
+
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+    response = client.post("/auth/refresh", json={"refresh_token": new_tokens["refresh_token"]})
+    assert response.status_code == 200
+
+
+def test_refresh_reuse_of_rotated_token_is_rejected_without_error(client):
+    tokens = register_and_login(client, "ana@example.com")
+    refresh = {"refresh_token": tokens["refresh_token"]}
+
+    assert client.post("/auth/refresh", json=refresh).status_code == 200
+    assert client.post("/auth/refresh", json=refresh).status_code == 401
+
+    # Aunque el jti no estuviera aún en memoria, la fila ya reclamada rechaza el token
+    token_revocation._revoked.clear()
+    assert client.post("/auth/refresh", json=refresh).status_code == 401
+
+
+def test_logins_on_two_devices_can_both_refresh(client):
+    device_a = register_and_login(client, "ana@example.com")
+    device_b = register_and_login(client, "ana@example.com")
+
+    response = client.post("/auth/refresh", json={"refresh_token": device_a["refresh_token"]})
+    assert response.status_code == 200
+
+    response = client.post("/auth/refresh", json={"refresh_token": device_b["refresh_token"]})
+    assert response.status_code == 200
+
+
+def test_refresh_rejects_access_token(client):
+    tokens = register_and_login(client, "ana@example.com")
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["access_token"]})
+    assert response.status_code == 401
+
+
+def test_logout_invalidates_access_and_refresh_tokens(client, session_factory):
+    tokens = register_and_login(client, "ana@example.com")
+
+    response = client.post("/auth/logout", headers=bearer(tokens["access_token"]))
+    assert response.status_code == 200
+
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+    response = client.post("/auth/logout", headers=bearer(tokens["access_token"]))
+    assert response.status_code == 401
+
+    refresh_claims = jwt.get_unverified_claims(tokens["refresh_token"])
+    db = session_factory()
+    try:
+        assert db.query(RefreshToken).count() == 0
+        # El refresh token se guarda con su expiración real, no con una cota
+        revoked = db.get(RevokedToken, refresh_claims["jti"])
+        assert revoked.expires_at == datetime.utcfromtimestamp(refresh_claims["exp"])
+        assert db.query(RevokedToken).count() == 2
+    finally:
+        db.close()
+
+
+def test_logout_only_ends_the_current_session(client):
+    device_a = register_and_login(client, "ana@example.com")
+    device_b = register_and_login(client, "ana@example.com")
+
+    response = client.post("/auth/logout", headers=bearer(device_a["access_token"]))
+    assert response.status_code == 200
+
+    response = client.post("/auth/refresh", json={"refresh_token": device_a["refresh_token"]})
+    assert response.status_code == 401
+
+    response = client.post("/auth/refresh", json={"refresh_token": device_b["refresh_token"]})
+    assert response.status_code == 200
+
+
+def test_revoke_refresh_token_ends_its_session(client, session_factory):
+    tokens = register_and_login(client, "ana@example.com")
+
+    response = client.post(
+        "/auth/revoke",
+        json={"token": tokens["refresh_token"]},
+        headers=bearer(tokens["access_token"]),
+    )
+    assert response.status_code == 200
+
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+    db = session_factory()
+    try:
+        assert db.query(RefreshToken).count() == 0
+    finally:
+        db.close()
+
+
+def test_revoke_other_users_token_is_forbidden(client):
+    ana = register_and_login(client, "ana@example.com")
+    luis = register_and_login(client, "luis@example.com")
+
+    response = client.post(
+        "/auth/revoke",
+        json={"token": luis["refresh_token"]},
+        headers=bearer(ana["access_token"]),
+    )
+    assert response.status_code == 403
+
+    response = client.post("/auth/refresh", json={"refresh_token": luis["refresh_token"]})
+    assert response.status_code == 200
+
+
+def test_revoke_token_prunes_expired_entries(session_factory):
+    now = datetime.utcnow()
+    token_revocation._revoked["old"] = now - timedelta(seconds=1)
+    heapq.heappush(token_revocation._expiry_heap, (now - timedelta(seconds=1), "old"))
+
+    db = session_factory()
+    try:
+        token_revocation.revoke_token(db, "new", now + timedelta(minutes=5))
+    finally:
+        db.close()
+
+    assert not token_revocation.is_token_revoked("old")
+    assert token_revocation.is_token_revoked("new")
+    assert [jti for _, jti in token_revocation._expiry_heap] == ["new"]
+
+
+def test_revoke_token_is_idempotent(session_factory):
+    expires_at = datetime.utcnow() + timedelta(minutes=5)
+    db = session_factory()
+    try:
+        token_revocation.revoke_token(db, "same", expires_at)
+        token_revocation.revoke_token(db, "same", expires_at)
+        assert db.query(RevokedToken).count() == 1
+    finally:
+        db.close()
+
+    assert token_revocation.is_token_revoked("same")
+    assert len(token_revocation._expiry_heap) == 1
+
+
+def test_load_revoked_tokens_skips_and_deletes_expired(session_factory):
+    now = datetime.utcnow()
+    db = session_factory()
+    try:
+        db.add(RevokedToken(jti="expired", expires_at=now - timedelta(minutes=1)))
+        db.add(RevokedToken(jti="active", expires_at=now + timedelta(minutes=5)))
+        db.commit()
+
+        token_revocation.load_revoked_tokens(db)
+
+        assert token_revocation.is_token_revoked("active")
+        assert not token_revocation.is_token_revoked("expired")
+        assert [jti for _, jti in token_revocation._expiry_heap] == ["active"]
+        assert [row.jti for row in db.query(RevokedToken).all()] == ["active"]
+    finally:
+        db.close()
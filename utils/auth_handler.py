@@ -1,16 +1,22 @@
+import logging
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
+from uuid import uuid4
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from models.user import User  # Importa el modelo de usuario
-from database import SessionLocal
+from database import get_db
+from utils.token_revocation import is_token_revoked
+
+logger = logging.getLogger(__name__)
 
 # 🔑 Clave secreta y algoritmo de cifrado
 SECRET_KEY = "@Chuchoman23"
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60
+ACCESS_TOKEN_EXPIRE_MINUTES = 15
+REFRESH_TOKEN_EXPIRE_DAYS = 7
 
 # 🔐 Esquema de autenticación OAuth2 con contraseña
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")  # URL del endpoint de login
@@ -54,51 +60,66 @@ def create_access_token(data: dict, expires_delta: timedelta = timedelta(minutes
     if not email:
         raise ValueError("❌ No se proporcionó un email en los datos del token")
 
-    to_encode.update({"exp": expire, "sub": email})  # 'sub' contiene el email del usuario
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    
-    print(f"🔑 Token generado: {encoded_jwt}")  # Imprimir token para depuración
-    
-    return encoded_jwt
+    # 'sub' contiene el email del usuario, 'jti' identifica el token para poder revocarlo
+    to_encode.update({"exp": expire, "sub": email, "jti": uuid4().hex, "type": "access"})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+# 🔹 Función para crear un refresh token JWT (devuelve el token, su jti y su expiración)
+def create_refresh_token(email: str, expires_delta: timedelta = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)):
+    jti = uuid4().hex
+    # Sin microsegundos: el claim 'exp' se guarda en segundos y así coincide con la base de datos
+    expire = (datetime.utcnow() + expires_delta).replace(microsecond=0)
+    to_encode = {"sub": email, "exp": expire, "jti": jti, "type": "refresh"}
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM), jti, expire
+
+# 🔹 Función para decodificar un token y validar su tipo y que no esté revocado
+def decode_token(token: str, token_type: str = "access"):
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="No se pudo validar las credenciales",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
 
-# 🔹 Función para obtener la sesión de la base de datos
-def get_db():
-    db = SessionLocal()
     try:
-        yield db
-    finally:
-        db.close()
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError as e:
+        logger.debug("Error al decodificar JWT: %s", e)
+        raise credentials_exception
+
+    if payload.get("type") != token_type:
+        logger.debug("Tipo de token incorrecto, se esperaba '%s'", token_type)
+        raise credentials_exception
+
+    jti = payload.get("jti")
+    if jti is None or payload.get("sub") is None:
+        logger.debug("Faltan 'sub' o 'jti' en el token")
+        raise credentials_exception
+
+    # Comprobación en memoria, no añade consultas a la base de datos
+    if is_token_revoked(jti):
+        logger.debug("Token revocado")
+        raise credentials_exception
+
+    return payload
 
 # 🔹 Dependencia para obtener el usuario actual
 def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
-    print(f"🔍 Token recibido: {token}")  # Verifica que el token esté llegando
-    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudo validar las credenciales",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        # Decodificar el token JWT
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        print(f"🔍 Payload decodificado: {payload}")  # Verifica el contenido del token
-        
-        email: str = payload.get("sub")  # Extraer email del token
-        if email is None:
-            print("❌ No se encontró 'sub' en el token")
-            raise credentials_exception
-        
-        # Buscar usuario en la base de datos
-        user = db.query(User).filter(User.email == email).first()
-        print(f"👤 Usuario encontrado: {user}")  # Verificar si el usuario existe
-        
-        if user is None:
-            print("❌ Usuario no encontrado en la base de datos")
-            raise credentials_exception
-        
-        return user  # Si el usuario es válido, retornamos el usuario
-        
-    except JWTError as e:
-        print(f"❌ Error al decodificar JWT: {e}")
+    # Decodificar el token JWT (valida firma, expiración, tipo y revocación)
+    payload = decode_token(token)
+    
+    email: str = payload.get("sub")  # Extraer email del token
+    
+    # Buscar usuario en la base de datos
+    user = db.query(User).filter(User.email == email).first()
+    
+    if user is None:
+        logger.debug("Usuario no encontrado en la base de datos")
         raise credentials_exception
+    
+    return user  # Si el usuario es válido, retornamos el usuario
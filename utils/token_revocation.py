@@ -0,0 +1,57 @@
+import heapq
+import threading
+from datetime import datetime
+from sqlalchemy.orm import Session
+from models.revoked_token import RevokedToken
+
+# 🧠 Conjunto en memoria de tokens revocados: jti -> expiración.
+# La tabla 'revoked_tokens' es la copia persistente; este dict es el que se
+# consulta en cada petición, así que comprobar un token no toca la base de datos.
+_revoked = {}
+
+# Montículo (expiración, jti) para podar en orden sin recorrer todo el dict
+_expiry_heap = []
+
+_lock = threading.Lock()
+
+# 🔹 Quita de memoria los tokens que ya expiraron (un token expirado lo rechaza el propio JWT)
+def _prune_memory(now: datetime):
+    while _expiry_heap and _expiry_heap[0][0] <= now:
+        _, jti = heapq.heappop(_expiry_heap)
+        _revoked.pop(jti, None)
+
+# 🔹 Carga los tokens revocados vigentes desde la base de datos (al arrancar la app)
+def load_revoked_tokens(db: Session):
+    now = datetime.utcnow()
+    db.query(RevokedToken).filter(RevokedToken.expires_at <= now).delete()
+    db.commit()
+
+    rows = db.query(RevokedToken.jti, RevokedToken.expires_at).all()
+    with _lock:
+        _revoked.clear()
+        _expiry_heap.clear()
+        for jti, expires_at in rows:
+            _revoked[jti] = expires_at
+            _expiry_heap.append((expires_at, jti))
+        heapq.heapify(_expiry_heap)
+
+# 🔹 Comprobación O(1) en memoria, sin consultas a la base de datos
+def is_token_revoked(jti: str) -> bool:
+    return jti in _revoked
+
+# 🔹 Revoca un token: lo guarda en la base de datos y en memoria, y poda los expirados
+def revoke_token(db: Session, jti: str, expires_at: datetime):
+    now = datetime.utcnow()
+    active = expires_at > now  # Si ya expiró no hace falta recordarlo
+
+    if active:
+        # merge es idempotente: revocar dos veces el mismo jti no choca con la clave primaria
+        db.merge(RevokedToken(jti=jti, expires_at=expires_at))
+    db.query(RevokedToken).filter(RevokedToken.expires_at <= now).delete()
+    db.commit()
+
+    with _lock:
+        if active and jti not in _revoked:
+            _revoked[jti] = expires_at
+            heapq.heappush(_expiry_heap, (expires_at, jti))
+        _prune_memory(now)